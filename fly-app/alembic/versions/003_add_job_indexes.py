@@ -0,0 +1,28 @@
+"""Add composite indexes for job queue queries
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_jobs_status_submitted_at', 'jobs', ['status', 'submitted_at'])
+    op.create_index('ix_jobs_status_approved_at', 'jobs', ['status', 'approved_at'])
+    op.create_index('ix_jobs_user_id_submitted_at', 'jobs', ['user_id', sa.text('submitted_at DESC')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_user_id_submitted_at', table_name='jobs')
+    op.drop_index('ix_jobs_status_approved_at', table_name='jobs')
+    op.drop_index('ix_jobs_status_submitted_at', table_name='jobs')
@@ -0,0 +1,47 @@
+"""Store ids as native uuid generated by Postgres
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-02-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # gen_random_uuid() is built in from Postgres 13 onwards. Foreign keys have
+    # to go while the referenced column changes type.
+    op.drop_constraint('jobs_user_id_fkey', 'jobs', type_='foreignkey')
+    op.drop_constraint('jobs_approved_by_id_fkey', 'jobs', type_='foreignkey')
+
+    op.execute('ALTER TABLE users ALTER COLUMN id TYPE uuid USING id::uuid')
+    op.execute('ALTER TABLE users ALTER COLUMN id SET DEFAULT gen_random_uuid()')
+    op.execute('ALTER TABLE jobs ALTER COLUMN id TYPE uuid USING id::uuid')
+    op.execute('ALTER TABLE jobs ALTER COLUMN id SET DEFAULT gen_random_uuid()')
+    op.execute('ALTER TABLE jobs ALTER COLUMN user_id TYPE uuid USING user_id::uuid')
+    op.execute('ALTER TABLE jobs ALTER COLUMN approved_by_id TYPE uuid USING approved_by_id::uuid')
+
+    op.create_foreign_key('jobs_user_id_fkey', 'jobs', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('jobs_approved_by_id_fkey', 'jobs', 'users', ['approved_by_id'], ['id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('jobs_user_id_fkey', 'jobs', type_='foreignkey')
+    op.drop_constraint('jobs_approved_by_id_fkey', 'jobs', type_='foreignkey')
+
+    op.execute('ALTER TABLE jobs ALTER COLUMN approved_by_id TYPE varchar USING approved_by_id::text')
+    op.execute('ALTER TABLE jobs ALTER COLUMN user_id TYPE varchar USING user_id::text')
+    op.execute('ALTER TABLE jobs ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER TABLE jobs ALTER COLUMN id TYPE varchar USING id::text')
+    op.execute('ALTER TABLE users ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER TABLE users ALTER COLUMN id TYPE varchar USING id::text')
+
+    op.create_foreign_key('jobs_user_id_fkey', 'jobs', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('jobs_approved_by_id_fkey', 'jobs', 'users', ['approved_by_id'], ['id'])
@@ -0,0 +1,33 @@
+"""Store oauth_provider as an enum and index the OAuth lookup
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-20
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+oauth_provider = sa.Enum('google', 'github', name='oauthprovider')
+
+
+def upgrade() -> None:
+    oauth_provider.create(op.get_bind())
+    op.execute(
+        'ALTER TABLE users ALTER COLUMN oauth_provider TYPE oauthprovider '
+        'USING oauth_provider::oauthprovider'
+    )
+    op.create_index('ix_users_provider_oauthid', 'users', ['oauth_provider', 'oauth_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_provider_oauthid', table_name='users')
+    op.execute('ALTER TABLE users ALTER COLUMN oauth_provider TYPE varchar USING oauth_provider::text')
+    oauth_provider.drop(op.get_bind())
@@ -0,0 +1,26 @@
+"""Add print_layer_num and print_remaining_minutes fields to jobs
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-02-27
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('print_layer_num', sa.Integer(), nullable=True))
+    op.add_column('jobs', sa.Column('print_remaining_minutes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'print_remaining_minutes')
+    op.drop_column('jobs', 'print_layer_num')
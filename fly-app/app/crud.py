@@ -0,0 +1,69 @@
+from fastapi import HTTPException
+from sqlalchemy import RowMapping, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased, joinedload
+from uuid import UUID
+import asyncio
+
+from app.models import Job, JobStatus
+
+
+# Set (and replaced) whenever a job becomes approved, to wake printers that
+# are long-polling /printer/jobs/next. The app runs as a single worker, so an
+# in-process event reaches every waiting request.
+_job_approved = asyncio.Event()
+
+
+def job_approved_event() -> asyncio.Event:
+    """The event the next notify_job_approved() will set.
+
+    Grab it before checking for jobs, so an approval in between isn't missed.
+    """
+    return _job_approved
+
+
+def notify_job_approved() -> None:
+    """Wake printers waiting in /printer/jobs/next. Call after the commit."""
+    global _job_approved
+    _job_approved.set()
+    _job_approved = asyncio.Event()
+
+
+async def transition_job(
+    db: AsyncSession,
+    job_id: UUID,
+    from_statuses: tuple[JobStatus, ...],
+    error_detail: str,
+    columns: tuple[InstrumentedAttribute, ...] = (),
+    **values,
+) -> Job | RowMapping:
+    """Atomically update a job that is in one of `from_statuses`.
+
+    Uses a single UPDATE ... RETURNING, so the common path is one round-trip.
+    Only when nothing matched do we look the job up again to tell a missing
+    job (404) apart from one in the wrong status (400). `error_detail` may
+    reference the current status as `{status}`.
+
+    With `columns`, only those columns are returned, as a row mapping.
+    Otherwise the UPDATE runs in a CTE that is joined to users, so the Job
+    comes back with its user loaded in the same statement.
+    """
+    stmt = update(Job).where(Job.id == job_id, Job.status.in_(from_statuses)).values(**values)
+
+    if columns:
+        result = await db.execute(stmt.returning(*columns))
+        job = result.mappings().one_or_none()
+    else:
+        updated = stmt.returning(*Job.__table__.c).cte("updated_job")
+        updated_job = aliased(Job, updated)
+        result = await db.execute(select(updated_job).options(joinedload(updated_job.user)))
+        job = result.scalar_one_or_none()
+
+    if not job:
+        current_status = await db.scalar(select(Job.status).where(Job.id == job_id))
+        if current_status is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=400, detail=error_detail.format(status=current_status))
+
+    await db.commit()
+    return job
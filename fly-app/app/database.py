@@ -1,5 +1,7 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
+from uuid import uuid4
 from app.config import get_settings
 
 settings = get_settings()
@@ -9,7 +11,31 @@ database_url = settings.database_url
 if database_url.startswith("postgresql://"):
     database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-engine = create_async_engine(database_url, echo=False)
+if settings.db_behind_pgbouncer:
+    # Let PgBouncer pool connections. In its transaction mode, statement caches
+    # don't survive, and asyncpg's numbered statement names would collide
+    # across the server connections PgBouncer hands out, so use unique names.
+    engine = create_async_engine(
+        database_url,
+        echo=False,
+        poolclass=NullPool,
+        connect_args={
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    )
+else:
+    engine = create_async_engine(
+        database_url,
+        echo=False,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        connect_args={"prepared_statement_cache_size": 256, "statement_cache_size": 256},
+    )
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.sessions import SessionMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.config import get_settings
+from app.middleware import BrowserCORSMiddleware, ScopedSessionMiddleware
+from app.oauth import GITHUB_CLIENT, prime_google_metadata
 from app.routers import auth, jobs, admin, printer
 from app.schemas import HealthResponse
 
@@ -13,17 +14,20 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# CORS middleware
+# CORS middleware (only browser requests carry an Origin header)
 app.add_middleware(
-    CORSMiddleware,
+    BrowserCORSMiddleware,
     allow_origins=[settings.frontend_url],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Session middleware for OAuth
-app.add_middleware(SessionMiddleware, secret_key=settings.secret_key)
+# Session middleware for OAuth, limited to the /auth routes
+app.add_middleware(ScopedSessionMiddleware, secret_key=settings.secret_key, paths=("/auth",))
+
+# Compress large responses (e.g. the admin job lists); added last so it wraps everything
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -32,6 +36,16 @@ app.include_router(admin.router, prefix="/admin", tags=["admin"])
 app.include_router(printer.router, prefix="/printer", tags=["printer"])
 
 
+@app.on_event("startup")
+async def prime_oauth():
+    await prime_google_metadata()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await GITHUB_CLIENT.aclose()
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     return HealthResponse(status="healthy")
@@ -0,0 +1,42 @@
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class ScopedSessionMiddleware:
+    """Session middleware that only runs for the given path prefixes.
+
+    Sessions are only needed for the OAuth state in the /auth flows, so every
+    other request skips the cookie parsing and signing entirely.
+    """
+
+    def __init__(self, app: ASGIApp, secret_key: str, paths: tuple[str, ...] = ("/auth",), **kwargs):
+        self.app = app
+        self.paths = paths
+        self._inner = SessionMiddleware(app, secret_key=secret_key, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        await self._inner(scope, receive, send)
+
+
+class BrowserCORSMiddleware:
+    """CORS middleware that skips requests without an Origin header.
+
+    Server-to-server callers (like the printer) never send Origin, so they
+    go straight to the app.
+    """
+
+    def __init__(self, app: ASGIApp, **kwargs):
+        self.app = app
+        self._inner = CORSMiddleware(app, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not any(name == b"origin" for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        await self._inner(scope, receive, send)
@@ -1,13 +1,9 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.database import Base
 import enum
-import uuid
-
-
-def generate_uuid():
-    return str(uuid.uuid4())
 
 
 class JobStatus(str, enum.Enum):
@@ -20,14 +16,35 @@ class JobStatus(str, enum.Enum):
     failed = "failed"
 
 
+# Which statuses a job may move to from each status
+ALLOWED_TRANSITIONS: dict[JobStatus, frozenset[JobStatus]] = {
+    JobStatus.submitted: frozenset({JobStatus.approved, JobStatus.rejected}),
+    JobStatus.approved: frozenset({JobStatus.queued}),
+    # queued -> approved is the printer handing back a job it claimed but never started
+    JobStatus.queued: frozenset({JobStatus.printing, JobStatus.failed, JobStatus.approved}),
+    JobStatus.printing: frozenset({JobStatus.done, JobStatus.failed}),
+}
+
+# The inverse: which statuses a job must be in to move to each status
+ALLOWED_SOURCES: dict[JobStatus, tuple[JobStatus, ...]] = {
+    target: tuple(source for source in JobStatus if target in ALLOWED_TRANSITIONS.get(source, ()))
+    for target in JobStatus
+}
+
+
+class OAuthProvider(str, enum.Enum):
+    google = "google"
+    github = "github"
+
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=generate_uuid)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     email = Column(String, unique=True, nullable=False, index=True)
     name = Column(String, nullable=True)
     avatar_url = Column(String, nullable=True)
-    oauth_provider = Column(String, nullable=False)  # "google" or "github"
+    oauth_provider = Column(SQLEnum(OAuthProvider), nullable=False)
     oauth_id = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -35,12 +52,17 @@ class User(Base):
     jobs = relationship("Job", back_populates="user", foreign_keys="Job.user_id")
     approved_jobs = relationship("Job", back_populates="approved_by", foreign_keys="Job.approved_by_id")
 
+    __table_args__ = (
+        # Login lookup in get_or_create_user
+        Index("ix_users_provider_oauthid", oauth_provider, oauth_id, unique=True),
+    )
+
 
 class Job(Base):
     __tablename__ = "jobs"
 
-    id = Column(String, primary_key=True, default=generate_uuid)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     filename = Column(String, nullable=False)
     tigris_key = Column(String, nullable=False)
     file_size_bytes = Column(Integer, nullable=False)
@@ -49,8 +71,18 @@ class Job(Base):
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
     approved_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    approved_by_id = Column(String, ForeignKey("users.id"), nullable=True)
+    approved_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     print_progress = Column(Integer, nullable=True)
+    print_layer_num = Column(Integer, nullable=True)
+    print_remaining_minutes = Column(Integer, nullable=True)
 
     user = relationship("User", back_populates="jobs", foreign_keys=[user_id])
     approved_by = relationship("User", back_populates="approved_jobs", foreign_keys=[approved_by_id])
+
+    __table_args__ = (
+        # Admin pending list and printer dispatch filter by status, ordered by time
+        Index("ix_jobs_status_submitted_at", status, submitted_at),
+        Index("ix_jobs_status_approved_at", status, approved_at),
+        # A user's own job list, newest first
+        Index("ix_jobs_user_id_submitted_at", user_id, submitted_at.desc()),
+    )
@@ -1,7 +1,11 @@
+import logging
+
+import httpx
 from authlib.integrations.starlette_client import OAuth
 from starlette.config import Config
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 oauth = OAuth()
@@ -25,3 +29,24 @@ oauth.register(
     client_kwargs={"scope": "user:email"},
     api_base_url="https://api.github.com/",
 )
+
+# Shared client for GitHub API calls after login, so TLS connections are reused
+# across logins. Closed on app shutdown.
+GITHUB_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+
+
+async def prime_google_metadata() -> None:
+    """Load Google's OIDC metadata and JWKS before the first login needs them."""
+    if not settings.google_client_id:
+        return
+
+    try:
+        await oauth.google.load_server_metadata()
+        await oauth.google.fetch_jwk_set()
+    except (httpx.HTTPError, ValueError) as e:
+        # Not fatal: Authlib fetches it lazily on the first login instead
+        logger.warning(f"Failed to preload Google OIDC metadata: {e}")
@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
-from datetime import datetime
 from typing import List
+from uuid import UUID
 
+from app.crud import notify_job_approved, transition_job
 from app.database import get_db
-from app.models import User, Job, JobStatus
-from app.schemas import JobWithUser, JobApprovalRequest
+from app.models import ALLOWED_SOURCES, Job, JobStatus
+from app.schemas import JobWithUser, JobApprovalRequest, UserResponse
 from app.routers.auth import get_current_admin
 
 router = APIRouter()
 
+# Serialize job lists straight to JSON with pydantic-core instead of FastAPI's
+# per-item response model handling
+_jobs_adapter = TypeAdapter(List[JobWithUser])
+
+
+def _jobs_response(jobs) -> Response:
+    validated = _jobs_adapter.validate_python(jobs, from_attributes=True)
+    return Response(_jobs_adapter.dump_json(validated), media_type="application/json")
+
 
 @router.get("/jobs", response_model=List[JobWithUser])
 async def list_pending_jobs(
     status: JobStatus | None = None,
-    admin: User = Depends(get_current_admin),
+    admin: UserResponse = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     query = select(Job).options(selectinload(Job.user))
@@ -30,12 +41,12 @@ async def list_pending_jobs(
     query = query.order_by(Job.submitted_at.asc())
     result = await db.execute(query)
     jobs = result.scalars().all()
-    return jobs
+    return _jobs_response(jobs)
 
 
 @router.get("/jobs/all", response_model=List[JobWithUser])
 async def list_all_jobs(
-    admin: User = Depends(get_current_admin),
+    admin: UserResponse = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -44,93 +55,67 @@ async def list_all_jobs(
         .order_by(Job.submitted_at.desc())
     )
     jobs = result.scalars().all()
-    return jobs
+    return _jobs_response(jobs)
 
 
 @router.post("/jobs/{job_id}/approve", response_model=JobWithUser)
 async def approve_job(
-    job_id: str,
+    job_id: UUID,
     request: JobApprovalRequest = None,
-    admin: User = Depends(get_current_admin),
+    admin: UserResponse = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Job).options(selectinload(Job.user)).where(Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status != JobStatus.submitted:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job cannot be approved (current status: {job.status})",
-        )
-
-    job.status = JobStatus.approved
-    job.approved_at = datetime.utcnow()
-    job.approved_by_id = admin.id
+    values = {
+        "status": JobStatus.approved,
+        "approved_at": func.now(),
+        "approved_by_id": admin.id,
+    }
     if request and request.message:
-        job.status_message = request.message
-
-    await db.commit()
-    await db.refresh(job)
+        values["status_message"] = request.message
+
+    job = await transition_job(
+        db,
+        job_id,
+        # Not ALLOWED_SOURCES: queued -> approved is only for the printer's release
+        (JobStatus.submitted,),
+        "Job cannot be approved (current status: {status})",
+        **values,
+    )
+    notify_job_approved()
     return job
 
 
 @router.post("/jobs/{job_id}/reject", response_model=JobWithUser)
 async def reject_job(
-    job_id: str,
+    job_id: UUID,
     request: JobApprovalRequest = None,
-    admin: User = Depends(get_current_admin),
+    admin: UserResponse = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Job).options(selectinload(Job.user)).where(Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status != JobStatus.submitted:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job cannot be rejected (current status: {job.status})",
-        )
-
-    job.status = JobStatus.rejected
+    values = {"status": JobStatus.rejected}
     if request and request.message:
-        job.status_message = request.message
-
-    await db.commit()
-    await db.refresh(job)
-    return job
+        values["status_message"] = request.message
+
+    return await transition_job(
+        db,
+        job_id,
+        ALLOWED_SOURCES[JobStatus.rejected],
+        "Job cannot be rejected (current status: {status})",
+        **values,
+    )
 
 
 @router.post("/jobs/{job_id}/queue", response_model=JobWithUser)
 async def queue_job(
-    job_id: str,
-    admin: User = Depends(get_current_admin),
+    job_id: UUID,
+    admin: UserResponse = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Move an approved job to the print queue."""
-    result = await db.execute(
-        select(Job).options(selectinload(Job.user)).where(Job.id == job_id)
+    return await transition_job(
+        db,
+        job_id,
+        ALLOWED_SOURCES[JobStatus.queued],
+        "Only approved jobs can be queued (current status: {status})",
+        status=JobStatus.queued,
     )
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status != JobStatus.approved:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Only approved jobs can be queued (current status: {job.status})",
-        )
-
-    job.status = JobStatus.queued
-    await db.commit()
-    await db.refresh(job)
-    return job
@@ -2,26 +2,41 @@ from fastapi import APIRouter, Depends, HTTPException, Response, Request, Header
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from jose import jwt
+import jwt
+from cachetools import TTLCache
 from datetime import datetime, timedelta
-import httpx
-import secrets
+import asyncio
+import hashlib
+import hmac
+import time
+from uuid import UUID
 
 from app.database import get_db
-from app.models import User
+from app.models import User, OAuthProvider
 from app.schemas import UserResponse
 from app.config import get_settings
-from app.oauth import oauth
+from app.oauth import oauth, GITHUB_CLIENT
 
 router = APIRouter()
 settings = get_settings()
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
-
-
-def create_access_token(user_id: str) -> str:
-    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode = {"sub": user_id, "exp": expire}
+_token_lifetime = timedelta(minutes=settings.access_token_expire_minutes)
+_token_max_age = int(_token_lifetime.total_seconds())
+_jwt_algorithms = [settings.algorithm]
+_printer_key_digest = (
+    hashlib.sha256(settings.printer_api_key.encode()).digest() if settings.printer_api_key else None
+)
+
+# Short-lived caches so authenticated requests don't decode the JWT and query
+# the users table every time. Entries may be up to a minute stale.
+_token_cache: TTLCache[str, tuple[UUID, float]] = TTLCache(maxsize=10_000, ttl=60)
+_user_cache: TTLCache[UUID, UserResponse] = TTLCache(maxsize=10_000, ttl=60)
+
+
+def create_access_token(user_id: UUID) -> str:
+    expire = datetime.utcnow() + _token_lifetime
+    to_encode = {"sub": str(user_id), "exp": expire}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -32,28 +47,37 @@ def get_token_from_cookie(request: Request) -> str | None:
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(get_db),
-) -> User:
+) -> UserResponse:
     token = get_token_from_cookie(request)
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id = payload.get("sub")
-        if not user_id:
+    cached_token = _token_cache.get(token)
+    if cached_token and cached_token[1] > time.time():
+        user_id = cached_token[0]
+    else:
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=_jwt_algorithms)
+            user_id = UUID(payload.get("sub"))
+        except (jwt.PyJWTError, TypeError, ValueError):
             raise HTTPException(status_code=401, detail="Invalid token")
-    except jwt.JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        _token_cache[token] = (user_id, payload.get("exp", 0))
+
+    user = _user_cache.get(user_id)
+    if user:
+        return user
 
     result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
+    db_user = result.scalar_one_or_none()
+    if not db_user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    user = UserResponse.model_validate(db_user)
+    _user_cache[user_id] = user
     return user
 
 
-async def get_current_admin(user: User = Depends(get_current_user)) -> User:
+async def get_current_admin(user: UserResponse = Depends(get_current_user)) -> UserResponse:
     if not user.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
@@ -64,10 +88,11 @@ async def get_printer_api_key(api_key: str | None = Depends(api_key_header)) ->
     if not api_key:
         raise HTTPException(status_code=401, detail="API key required")
 
-    if not settings.printer_api_key:
+    if _printer_key_digest is None:
         raise HTTPException(status_code=500, detail="Printer API key not configured")
 
-    if not secrets.compare_digest(api_key, settings.printer_api_key):
+    # Comparing fixed-size digests keeps the check constant-time regardless of key length
+    if not hmac.compare_digest(hashlib.sha256(api_key.encode()).digest(), _printer_key_digest):
         raise HTTPException(status_code=401, detail="Invalid API key")
 
     return api_key
@@ -78,7 +103,7 @@ async def get_or_create_user(
     email: str,
     name: str | None,
     avatar_url: str | None,
-    oauth_provider: str,
+    oauth_provider: OAuthProvider,
     oauth_id: str,
 ) -> User:
     result = await db.execute(
@@ -87,11 +112,13 @@ async def get_or_create_user(
     user = result.scalar_one_or_none()
 
     if user:
-        # Update user info
-        user.email = email
-        user.name = name
-        user.avatar_url = avatar_url
-        await db.commit()
+        # Update user info, but only write when the profile actually changed
+        if user.email != email or user.name != name or user.avatar_url != avatar_url:
+            user.email = email
+            user.name = name
+            user.avatar_url = avatar_url
+            await db.commit()
+            _user_cache.pop(user.id, None)
         return user
 
     # Create new user
@@ -104,7 +131,6 @@ async def get_or_create_user(
     )
     db.add(user)
     await db.commit()
-    await db.refresh(user)
     return user
 
 
@@ -130,7 +156,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         email=user_info["email"],
         name=user_info.get("name"),
         avatar_url=user_info.get("picture"),
-        oauth_provider="google",
+        oauth_provider=OAuthProvider.google,
         oauth_id=user_info["sub"],
     )
 
@@ -143,7 +169,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         httponly=True,
         secure=True,
         samesite="lax",
-        max_age=settings.access_token_expire_minutes * 60,
+        max_age=_token_max_age,
     )
     return response
 
@@ -161,31 +187,28 @@ async def github_callback(request: Request, db: AsyncSession = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"OAuth error: {str(e)}")
 
-    # Get user info from GitHub API
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            "https://api.github.com/user",
-            headers={"Authorization": f"Bearer {token['access_token']}"},
-        )
-        user_data = resp.json()
-
-        # Get user email (may need separate API call if email is private)
-        email = user_data.get("email")
-        if not email:
-            resp = await client.get(
-                "https://api.github.com/user/emails",
-                headers={"Authorization": f"Bearer {token['access_token']}"},
-            )
-            emails = resp.json()
-            primary_email = next((e for e in emails if e.get("primary")), None)
-            email = primary_email["email"] if primary_email else emails[0]["email"]
+    # Fetch the profile and the email list concurrently; the email list is
+    # only needed when the profile email is private, but requesting both up
+    # front costs one round-trip instead of two.
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    user_resp, emails_resp = await asyncio.gather(
+        GITHUB_CLIENT.get("https://api.github.com/user", headers=headers),
+        GITHUB_CLIENT.get("https://api.github.com/user/emails", headers=headers),
+    )
+    user_data = user_resp.json()
+
+    email = user_data.get("email")
+    if not email:
+        emails = emails_resp.json()
+        primary_email = next((e for e in emails if e.get("primary")), None)
+        email = primary_email["email"] if primary_email else emails[0]["email"]
 
     user = await get_or_create_user(
         db=db,
         email=email,
         name=user_data.get("name") or user_data.get("login"),
         avatar_url=user_data.get("avatar_url"),
-        oauth_provider="github",
+        oauth_provider=OAuthProvider.github,
         oauth_id=str(user_data["id"]),
     )
 
@@ -198,13 +221,13 @@ async def github_callback(request: Request, db: AsyncSession = Depends(get_db)):
         httponly=True,
         secure=True,
         samesite="lax",
-        max_age=settings.access_token_expire_minutes * 60,
+        max_age=_token_max_age,
     )
     return response
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(user: User = Depends(get_current_user)):
+async def get_me(user: UserResponse = Depends(get_current_user)):
     return user
 
 
@@ -2,10 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
+from uuid import UUID
 
 from app.database import get_db
-from app.models import User, Job, JobStatus
-from app.schemas import JobResponse, JobCreate, UploadUrlResponse
+from app.models import Job, JobStatus
+from app.schemas import JobResponse, JobCreate, UploadUrlResponse, UserResponse
 from app.routers.auth import get_current_user
 from app.tigris import generate_upload_url, generate_download_url
 from app.config import get_settings
@@ -19,7 +20,7 @@ MAX_FILE_SIZE = settings.max_file_size_mb * 1024 * 1024  # Convert MB to bytes
 @router.post("", response_model=UploadUrlResponse)
 async def create_job(
     job_data: JobCreate,
-    user: User = Depends(get_current_user),
+    user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     # Validate file extension
@@ -42,11 +43,10 @@ async def create_job(
         status=JobStatus.submitted,
     )
     db.add(job)
-    await db.commit()
-    await db.refresh(job)
+    await db.flush()  # Assigns job.id
 
     # Generate pre-signed upload URL
-    upload_url, tigris_key = generate_upload_url(job.id, job_data.filename)
+    upload_url, tigris_key = generate_upload_url(str(job.id), job_data.filename)
 
     # Update job with tigris key
     job.tigris_key = tigris_key
@@ -61,7 +61,7 @@ async def create_job(
 
 @router.get("", response_model=List[JobResponse])
 async def list_jobs(
-    user: User = Depends(get_current_user),
+    user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -75,8 +75,8 @@ async def list_jobs(
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
-    job_id: str,
-    user: User = Depends(get_current_user),
+    job_id: UUID,
+    user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Job).where(Job.id == job_id))
@@ -94,8 +94,8 @@ async def get_job(
 
 @router.get("/{job_id}/download")
 async def get_download_url(
-    job_id: str,
-    user: User = Depends(get_current_user),
+    job_id: UUID,
+    user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(select(Job).where(Job.id == job_id))
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime
+from sqlalchemy import func, select, update
+from uuid import UUID
+import asyncio
+import time
 
+from app.crud import job_approved_event, notify_job_approved, transition_job
 from app.database import get_db
-from app.models import Job, JobStatus
+from app.models import ALLOWED_SOURCES, Job, JobStatus
 from app.schemas import (
     PrinterJobResponse,
     PrinterDownloadResponse,
@@ -16,157 +19,177 @@ from app.tigris import generate_download_url
 
 router = APIRouter()
 
+# The printer only ever sees PrinterJobResponse, so only fetch those columns
+PRINTER_JOB_COLUMNS = (Job.id, Job.filename, Job.tigris_key, Job.file_size_bytes, Job.status)
 
 @router.get("/jobs/next", response_model=PrinterJobResponse | None)
 async def get_next_job(
+    request: Request,
+    wait: int = Query(0, ge=0, le=55),
     _: str = Depends(get_printer_api_key),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the next approved job and mark it as queued."""
-    result = await db.execute(
-        select(Job)
+    """Get the next approved job and mark it as queued.
+
+    With `wait`, hold the request open for up to that many seconds until a
+    job is approved instead of returning null straight away.
+    """
+    # Claim the job in one statement; SKIP LOCKED keeps concurrent pollers
+    # from picking the same row.
+    next_job_id = (
+        select(Job.id)
         .where(Job.status == JobStatus.approved)
         .order_by(Job.approved_at.asc())
         .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    claim = (
+        update(Job)
+        .where(Job.id == next_job_id)
+        .values(status=JobStatus.queued)
+        .returning(*PRINTER_JOB_COLUMNS)
     )
-    job = result.scalar_one_or_none()
-
-    if not job:
-        return None
 
-    job.status = JobStatus.queued
-    await db.commit()
-    await db.refresh(job)
-
-    return job
+    deadline = time.monotonic() + wait
+    while True:
+        # Grab the event before trying, so an approval that lands between the
+        # claim and the wait below still wakes us
+        approved = job_approved_event()
+
+        # Don't claim a job for a printer that has gone away mid-wait
+        if await request.is_disconnected():
+            return None
+
+        result = await db.execute(claim)
+        job = result.mappings().one_or_none()
+        if job:
+            await db.commit()
+            return job
+
+        # End the transaction so the connection goes back to the pool
+        # while we wait
+        await db.rollback()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        try:
+            await asyncio.wait_for(approved.wait(), remaining)
+        except asyncio.TimeoutError:
+            return None
 
 
 @router.get("/jobs/{job_id}/download", response_model=PrinterDownloadResponse)
 async def get_job_download_url(
-    job_id: str,
+    job_id: UUID,
     _: str = Depends(get_printer_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     """Get a pre-signed download URL for a job's file."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
+    tigris_key = await db.scalar(select(Job.tigris_key).where(Job.id == job_id))
 
-    if not job:
+    if tigris_key is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    download_url = generate_download_url(job.tigris_key)
+    download_url = generate_download_url(tigris_key)
     return PrinterDownloadResponse(download_url=download_url)
 
 
 @router.post("/jobs/{job_id}/start", response_model=PrinterJobResponse)
 async def start_job(
-    job_id: str,
+    job_id: UUID,
     _: str = Depends(get_printer_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a job as printing."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status != JobStatus.queued:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job must be in 'queued' status to start, current status: {job.status}",
-        )
+    return await transition_job(
+        db,
+        job_id,
+        ALLOWED_SOURCES[JobStatus.printing],
+        "Job must be in 'queued' status to start, current status: {status}",
+        columns=PRINTER_JOB_COLUMNS,
+        status=JobStatus.printing,
+        print_progress=0,
+    )
 
-    job.status = JobStatus.printing
-    job.print_progress = 0
-    await db.commit()
-    await db.refresh(job)
 
+@router.post("/jobs/{job_id}/release", response_model=PrinterJobResponse)
+async def release_job(
+    job_id: UUID,
+    _: str = Depends(get_printer_api_key),
+    db: AsyncSession = Depends(get_db),
+):
+    """Hand a claimed job that was never started back to the approved pool."""
+    job = await transition_job(
+        db,
+        job_id,
+        (JobStatus.queued,),
+        "Job must be in 'queued' status to release, current status: {status}",
+        columns=PRINTER_JOB_COLUMNS,
+        status=JobStatus.approved,
+    )
+    notify_job_approved()
     return job
 
 
 @router.post("/jobs/{job_id}/progress", response_model=PrinterJobResponse)
 async def update_job_progress(
-    job_id: str,
+    job_id: UUID,
     progress_update: PrinterProgressUpdate,
     _: str = Depends(get_printer_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     """Update the print progress for a job."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status != JobStatus.printing:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job must be in 'printing' status to update progress, current status: {job.status}",
-        )
-
     if progress_update.progress < 0 or progress_update.progress > 100:
         raise HTTPException(status_code=400, detail="Progress must be between 0 and 100")
 
-    job.print_progress = progress_update.progress
-    await db.commit()
-    await db.refresh(job)
-
-    return job
+    return await transition_job(
+        db,
+        job_id,
+        (JobStatus.printing,),
+        "Job must be in 'printing' status to update progress, current status: {status}",
+        columns=PRINTER_JOB_COLUMNS,
+        print_progress=progress_update.progress,
+        print_layer_num=progress_update.layer_num,
+        print_remaining_minutes=progress_update.remaining_time,
+    )
 
 
 @router.post("/jobs/{job_id}/complete", response_model=PrinterJobResponse)
 async def complete_job(
-    job_id: str,
+    job_id: UUID,
     _: str = Depends(get_printer_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a job as done."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status != JobStatus.printing:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job must be in 'printing' status to complete, current status: {job.status}",
-        )
-
-    job.status = JobStatus.done
-    job.print_progress = 100
-    job.completed_at = datetime.utcnow()
-    await db.commit()
-    await db.refresh(job)
-
-    return job
+    return await transition_job(
+        db,
+        job_id,
+        ALLOWED_SOURCES[JobStatus.done],
+        "Job must be in 'printing' status to complete, current status: {status}",
+        columns=PRINTER_JOB_COLUMNS,
+        status=JobStatus.done,
+        print_progress=100,
+        print_remaining_minutes=0,
+        completed_at=func.now(),
+    )
 
 
 @router.post("/jobs/{job_id}/fail", response_model=PrinterJobResponse)
 async def fail_job(
-    job_id: str,
+    job_id: UUID,
     fail_request: PrinterFailRequest,
     _: str = Depends(get_printer_api_key),
     db: AsyncSession = Depends(get_db),
 ):
     """Mark a job as failed."""
-    result = await db.execute(select(Job).where(Job.id == job_id))
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status not in [JobStatus.queued, JobStatus.printing]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Job must be in 'queued' or 'printing' status to fail, current status: {job.status}",
-        )
-
-    job.status = JobStatus.failed
-    job.status_message = fail_request.error_message
-    job.completed_at = datetime.utcnow()
-    await db.commit()
-    await db.refresh(job)
-
-    return job
+    return await transition_job(
+        db,
+        job_id,
+        ALLOWED_SOURCES[JobStatus.failed],
+        "Job must be in 'queued' or 'printing' status to fail, current status: {status}",
+        columns=PRINTER_JOB_COLUMNS,
+        status=JobStatus.failed,
+        status_message=fail_request.error_message,
+        completed_at=func.now(),
+    )
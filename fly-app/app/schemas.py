@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
+from uuid import UUID
 from app.models import JobStatus
 
 
@@ -11,12 +12,11 @@ class UserBase(BaseModel):
 
 
 class UserResponse(UserBase):
-    id: str
+    id: UUID
     is_admin: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobBase(BaseModel):
@@ -28,8 +28,8 @@ class JobCreate(JobBase):
 
 
 class JobResponse(JobBase):
-    id: str
-    user_id: str
+    id: UUID
+    user_id: UUID
     tigris_key: str
     file_size_bytes: int
     status: JobStatus
@@ -37,11 +37,12 @@ class JobResponse(JobBase):
     submitted_at: datetime
     approved_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
-    approved_by_id: Optional[str] = None
+    approved_by_id: Optional[UUID] = None
     print_progress: Optional[int] = None
+    print_layer_num: Optional[int] = None
+    print_remaining_minutes: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class JobWithUser(JobResponse):
@@ -49,7 +50,7 @@ class JobWithUser(JobResponse):
 
 
 class UploadUrlResponse(BaseModel):
-    job_id: str
+    job_id: UUID
     upload_url: str
     tigris_key: str
 
@@ -66,14 +67,13 @@ class HealthResponse(BaseModel):
 # Printer API schemas
 class PrinterJobResponse(BaseModel):
     """Simplified job response for the printer API."""
-    id: str
+    id: UUID
     filename: str
     tigris_key: str
     file_size_bytes: int
     status: JobStatus
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PrinterDownloadResponse(BaseModel):
@@ -84,6 +84,8 @@ class PrinterDownloadResponse(BaseModel):
 class PrinterProgressUpdate(BaseModel):
     """Request body for updating print progress."""
     progress: int
+    layer_num: Optional[int] = Field(default=None, ge=0)
+    remaining_time: Optional[int] = Field(default=None, ge=0)  # minutes
 
 
 class PrinterFailRequest(BaseModel):
@@ -1,10 +1,16 @@
+import asyncio
+import time
 import boto3
+from functools import lru_cache
 from botocore.config import Config
 from app.config import get_settings
 
 settings = get_settings()
 
+DOWNLOAD_URL_REUSE_SECONDS = 15 * 60
 
+
+@lru_cache()
 def get_s3_client():
     return boto3.client(
         "s3",
@@ -35,7 +41,16 @@ def generate_upload_url(job_id: str, filename: str) -> tuple[str, str]:
 
 
 def generate_download_url(tigris_key: str) -> str:
-    """Generate a pre-signed URL for downloading a file from Tigris."""
+    """Generate a pre-signed URL for downloading a file from Tigris.
+
+    URLs are reused within 15 minute windows, so each one handed out is
+    still valid for at least 45 minutes.
+    """
+    return _presigned_download_url(tigris_key, int(time.time() // DOWNLOAD_URL_REUSE_SECONDS))
+
+
+@lru_cache(maxsize=4096)
+def _presigned_download_url(tigris_key: str, window: int) -> str:
     s3_client = get_s3_client()
 
     url = s3_client.generate_presigned_url(
@@ -50,10 +65,16 @@ def generate_download_url(tigris_key: str) -> str:
     return url
 
 
-def delete_file(tigris_key: str) -> None:
+async def delete_file(tigris_key: str) -> None:
     """Delete a file from Tigris."""
     s3_client = get_s3_client()
-    s3_client.delete_object(
+    await asyncio.to_thread(
+        s3_client.delete_object,
         Bucket=settings.tigris_bucket_name,
         Key=tigris_key,
     )
+
+
+async def delete_files(tigris_keys: list[str]) -> None:
+    """Delete several files from Tigris concurrently."""
+    await asyncio.gather(*(delete_file(key) for key in tigris_keys))
@@ -1,14 +1,56 @@
 import httpx
+import os
+import random
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from functools import wraps
+from typing import Iterator, Optional
 import logging
 
 from config import get_settings
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = get_settings().download_chunk_size_bytes
 
-@dataclass
+# The API rejects longer waits on /printer/jobs/next
+MAX_NEXT_JOB_WAIT_SECONDS = 55
+
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 10.0
+
+
+def retry_delay(attempt: int) -> float:
+    """Backoff before retry number `attempt` (from 0), with jitter."""
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** attempt)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def retry_transient(func):
+    """Retry a request on network errors, timeouts and 5xx responses.
+
+    Waits with exponential backoff and jitter between attempts. Only use this
+    on requests that are safe to send twice.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return func(*args, **kwargs)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                    raise
+                if attempt == RETRY_ATTEMPTS - 1:
+                    raise
+                delay = retry_delay(attempt)
+                logger.warning(f"Retrying {func.__name__} in {delay:.1f}s")
+                time.sleep(delay)
+    return wrapper
+
+
+@dataclass(slots=True)
 class Job:
     id: str
     filename: str
@@ -16,6 +58,36 @@ class Job:
     file_size_bytes: int
     status: str
 
+    @classmethod
+    def from_api(cls, data: dict) -> "Job":
+        return cls(
+            id=data["id"],
+            filename=data["filename"],
+            tigris_key=data["tigris_key"],
+            file_size_bytes=data["file_size_bytes"],
+            status=data["status"],
+        )
+
+
+class ResponseReader:
+    """Read-only file-like view over a streamed httpx response."""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 
 class APIClient:
     """HTTP client for communicating with the fly-app API."""
@@ -34,6 +106,13 @@ class APIClient:
                 base_url=self.base_url,
                 headers={"X-API-Key": self.api_key},
                 timeout=30.0,
+                # Retries only cover connection failures, so requests are
+                # never sent twice
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=3,
+                    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+                ),
             )
         return self._client
 
@@ -42,23 +121,26 @@ class APIClient:
             self._client.close()
             self._client = None
 
-    def get_next_job(self) -> Optional[Job]:
-        """Fetch the next approved job from the API."""
+    def get_next_job(self, wait: int = 0) -> Optional[Job]:
+        """Fetch the next approved job from the API.
+
+        With `wait`, the API holds the request open for up to that many
+        seconds until a job is approved.
+        """
+        wait = min(wait, MAX_NEXT_JOB_WAIT_SECONDS)
         try:
-            response = self.client.get("/printer/jobs/next")
+            response = self.client.get(
+                "/printer/jobs/next",
+                params={"wait": wait},
+                timeout=wait + 30.0,
+            )
             response.raise_for_status()
 
             data = response.json()
             if data is None:
                 return None
 
-            return Job(
-                id=data["id"],
-                filename=data["filename"],
-                tigris_key=data["tigris_key"],
-                file_size_bytes=data["file_size_bytes"],
-                status=data["status"],
-            )
+            return Job.from_api(data)
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching next job: {e.response.status_code}")
             raise
@@ -66,6 +148,7 @@ class APIClient:
             logger.error(f"Error fetching next job: {e}")
             raise
 
+    @retry_transient
     def get_download_url(self, job_id: str) -> str:
         """Get the pre-signed download URL for a job."""
         try:
@@ -86,13 +169,7 @@ class APIClient:
             response = self.client.post(f"/printer/jobs/{job_id}/start")
             response.raise_for_status()
             data = response.json()
-            return Job(
-                id=data["id"],
-                filename=data["filename"],
-                tigris_key=data["tigris_key"],
-                file_size_bytes=data["file_size_bytes"],
-                status=data["status"],
-            )
+            return Job.from_api(data)
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error starting job: {e.response.status_code}")
             raise
@@ -100,22 +177,37 @@ class APIClient:
             logger.error(f"Error starting job: {e}")
             raise
 
-    def update_progress(self, job_id: str, progress: int) -> Job:
-        """Update the print progress for a job."""
+    def release_job(self, job_id: str) -> Job:
+        """Hand a claimed job that was never started back to the approved pool."""
+        try:
+            response = self.client.post(f"/printer/jobs/{job_id}/release")
+            response.raise_for_status()
+            data = response.json()
+            return Job.from_api(data)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error releasing job: {e.response.status_code}")
+            raise
+        except Exception as e:
+            logger.error(f"Error releasing job: {e}")
+            raise
+
+    @retry_transient
+    def update_progress(
+        self,
+        job_id: str,
+        progress: int,
+        layer_num: Optional[int] = None,
+        remaining_time: Optional[int] = None,
+    ) -> Job:
+        """Update the print progress, current layer and minutes remaining for a job."""
         try:
             response = self.client.post(
                 f"/printer/jobs/{job_id}/progress",
-                json={"progress": progress},
+                json={"progress": progress, "layer_num": layer_num, "remaining_time": remaining_time},
             )
             response.raise_for_status()
             data = response.json()
-            return Job(
-                id=data["id"],
-                filename=data["filename"],
-                tigris_key=data["tigris_key"],
-                file_size_bytes=data["file_size_bytes"],
-                status=data["status"],
-            )
+            return Job.from_api(data)
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error updating progress: {e.response.status_code}")
             raise
@@ -129,13 +221,7 @@ class APIClient:
             response = self.client.post(f"/printer/jobs/{job_id}/complete")
             response.raise_for_status()
             data = response.json()
-            return Job(
-                id=data["id"],
-                filename=data["filename"],
-                tigris_key=data["tigris_key"],
-                file_size_bytes=data["file_size_bytes"],
-                status=data["status"],
-            )
+            return Job.from_api(data)
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error completing job: {e.response.status_code}")
             raise
@@ -152,13 +238,7 @@ class APIClient:
             )
             response.raise_for_status()
             data = response.json()
-            return Job(
-                id=data["id"],
-                filename=data["filename"],
-                tigris_key=data["tigris_key"],
-                file_size_bytes=data["file_size_bytes"],
-                status=data["status"],
-            )
+            return Job.from_api(data)
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error failing job: {e.response.status_code}")
             raise
@@ -166,13 +246,23 @@ class APIClient:
             logger.error(f"Error failing job: {e}")
             raise
 
+    @contextmanager
+    def stream_file(self, download_url: str) -> Iterator[ResponseReader]:
+        """Open the file at the given URL for streaming reads."""
+        with httpx.stream("GET", download_url, timeout=300.0) as response:
+            response.raise_for_status()
+            yield ResponseReader(response)
+
+    @retry_transient
     def download_file(self, download_url: str, destination: str) -> None:
         """Download a file from the given URL to the destination path."""
         try:
             with httpx.stream("GET", download_url, timeout=300.0) as response:
                 response.raise_for_status()
-                with open(destination, "wb") as f:
-                    for chunk in response.iter_bytes(chunk_size=8192):
+                with open(destination, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
                         f.write(chunk)
             logger.info(f"Downloaded file to {destination}")
         except Exception as e:
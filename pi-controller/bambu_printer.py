@@ -1,19 +1,25 @@
-import json
 import ssl
 import time
 import socket
 import logging
 import threading
 from dataclasses import dataclass
-from typing import Optional, Callable
-from ftplib import FTP, error_perm
+from typing import BinaryIO, Optional, Callable
+from ftplib import FTP, all_errors, error_perm
 
+import orjson
 import paho.mqtt.client as mqtt
 
 from config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# The printer uses a self-signed certificate, so verification is off. Shared
+# by every FTPS control and data connection.
+_SSL_CONTEXT = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+_SSL_CONTEXT.check_hostname = False
+_SSL_CONTEXT.verify_mode = ssl.CERT_NONE
+
 
 class SSLSocketWrapper:
     """Wrapper that prevents SSL unwrap() from hanging by skipping it."""
@@ -64,37 +70,47 @@ class ImplicitFTPS(FTP):
         self.port = port
         self.timeout = timeout
 
-        # Create SSL context
-        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        context.check_hostname = False
-        context.verify_mode = ssl.CERT_NONE
-
         # Create socket and wrap with SSL immediately (implicit TLS)
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(timeout)
         sock.connect((host, port))
-        self.sock = context.wrap_socket(sock, server_hostname=host)
+        self.sock = _SSL_CONTEXT.wrap_socket(sock, server_hostname=host)
         self.file = self.sock.makefile('r', encoding='utf-8')
 
         # Read the welcome message
         self.welcome = self.getresp()
         return self.welcome
 
+    def storbinary(self, cmd, fp, blocksize=8192, callback=None, rest=None):
+        """Like FTP.storbinary, but reads files into a single reused buffer.
+
+        The data connection is always TLS and the ssl module can't hand a
+        file to sendfile(2), so this is as close to zero-copy as we can get.
+        """
+        readinto = getattr(fp, "readinto", None)
+        if readinto is None or callback is not None:
+            return super().storbinary(cmd, fp, blocksize, callback, rest)
+
+        buf = bytearray(blocksize)
+        view = memoryview(buf)
+        self.voidcmd("TYPE I")
+        with self.transfercmd(cmd, rest) as conn:
+            while n := readinto(buf):
+                conn.sendall(view[:n])
+        return self.voidresp()
+
     def ntransfercmd(self, cmd, rest=None):
         """Override to use SSL for data connection."""
         size = None
         if self.passiveserver:
             host, port = self.makepasv()
 
-            # Create SSL context for data connection
-            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-
             conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             conn.settimeout(self.timeout)
             conn.connect((host, port))
-            ssl_conn = context.wrap_socket(conn, server_hostname=host)
+            # Resume the control connection's TLS session to skip a full
+            # handshake on the data connection
+            ssl_conn = _SSL_CONTEXT.wrap_socket(conn, server_hostname=host, session=self.sock.session)
 
             # Wrap to prevent unwrap() from hanging
             conn = SSLSocketWrapper(ssl_conn)
@@ -120,7 +136,7 @@ class ImplicitFTPS(FTP):
         return conn, size
 
 
-@dataclass
+@dataclass(frozen=True)
 class PrinterStatus:
     """Current status of the printer."""
     state: str  # "IDLE", "RUNNING", "PAUSE", "FINISH", "FAILED"
@@ -136,6 +152,7 @@ class BambuPrinter:
 
     MQTT_PORT = 8883
     FTPS_PORT = 990
+    FTPS_BLOCKSIZE = 1024 * 1024
 
     def __init__(self):
         settings = get_settings()
@@ -144,17 +161,17 @@ class BambuPrinter:
         self.access_code = settings.bambu_access_code
 
         self._mqtt_client: Optional[mqtt.Client] = None
+        self._ftps: Optional[ImplicitFTPS] = None
         self._status: Optional[PrinterStatus] = None
-        self._status_lock = threading.Lock()
-        self._connected = False
+        self._connected = threading.Event()
         self._on_status_update: Optional[Callable[[PrinterStatus], None]] = None
 
     @property
     def status(self) -> Optional[PrinterStatus]:
-        with self._status_lock:
-            return self._status
+        # PrinterStatus is immutable, so swapping the reference needs no lock
+        return self._status
 
-    def set_status_callback(self, callback: Callable[[PrinterStatus], None]):
+    def set_status_callback(self, callback: Optional[Callable[[PrinterStatus], None]]):
         """Set callback for status updates."""
         self._on_status_update = callback
 
@@ -183,28 +200,24 @@ class BambuPrinter:
         self._mqtt_client.loop_start()
 
         # Wait for connection
-        timeout = 10
-        start = time.time()
-        while not self._connected and (time.time() - start) < timeout:
-            time.sleep(0.1)
-
-        if not self._connected:
+        if not self._connected.wait(timeout=10):
             raise ConnectionError("Failed to connect to printer MQTT broker")
 
         logger.info("Connected to Bambu printer")
 
     def disconnect(self):
         """Disconnect from the printer."""
+        self._close_ftps()
         if self._mqtt_client:
             self._mqtt_client.loop_stop()
             self._mqtt_client.disconnect()
             self._mqtt_client = None
-            self._connected = False
+            self._connected.clear()
             logger.info("Disconnected from Bambu printer")
 
     def _on_connect(self, client, userdata, flags, rc):
         if rc == 0:
-            self._connected = True
+            self._connected.set()
             # Subscribe to status reports
             topic = f"device/{self.serial}/report"
             client.subscribe(topic)
@@ -216,15 +229,15 @@ class BambuPrinter:
             logger.error(f"MQTT connection failed with code {rc}")
 
     def _on_disconnect(self, client, userdata, rc):
-        self._connected = False
+        self._connected.clear()
         if rc != 0:
             logger.warning(f"Unexpected MQTT disconnect: {rc}")
 
     def _on_message(self, client, userdata, msg):
         try:
-            payload = json.loads(msg.payload.decode())
+            payload = orjson.loads(msg.payload)
             self._parse_status(payload)
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.warning(f"Failed to parse MQTT message: {msg.payload}")
         except Exception as e:
             logger.error(f"Error processing MQTT message: {e}")
@@ -248,8 +261,7 @@ class BambuPrinter:
             error_code=print_info.get("print_error") if print_info.get("print_error") else None,
         )
 
-        with self._status_lock:
-            self._status = status
+        self._status = status
 
         if self._on_status_update:
             self._on_status_update(status)
@@ -262,7 +274,7 @@ class BambuPrinter:
             return
 
         topic = f"device/{self.serial}/request"
-        payload = json.dumps({
+        payload = orjson.dumps({
             "pushing": {
                 "sequence_id": "0",
                 "command": "pushall"
@@ -272,28 +284,58 @@ class BambuPrinter:
 
     def upload_file(self, local_path: str, remote_filename: str) -> bool:
         """Upload a file to the printer via implicit FTPS."""
+        logger.info(f"Uploading {local_path} to printer as {remote_filename}")
         try:
-            logger.info(f"Uploading {local_path} to printer as {remote_filename}")
+            with open(local_path, "rb") as f:
+                return self.upload_fileobj(f, remote_filename)
+        except OSError as e:
+            logger.error(f"Failed to open {local_path}: {e}")
+            return False
 
-            # Connect via implicit FTPS (SSL from the start on port 990)
-            ftps = ImplicitFTPS(self.ip, self.FTPS_PORT)
-            ftps.login("bblp", self.access_code)
+    def upload_fileobj(self, fileobj: BinaryIO, remote_filename: str) -> bool:
+        """Upload everything read from `fileobj` to the printer via implicit FTPS."""
+        try:
+            ftps = self._get_ftps()
 
             # Upload to the cache directory
-            with open(local_path, "rb") as f:
-                ftps.storbinary(f"STOR /cache/{remote_filename}", f)
+            ftps.storbinary(f"STOR /cache/{remote_filename}", fileobj, blocksize=self.FTPS_BLOCKSIZE)
 
-            ftps.quit()
             logger.info(f"Successfully uploaded {remote_filename}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to upload file: {e}")
+            self._close_ftps()
             return False
 
+    def _get_ftps(self) -> ImplicitFTPS:
+        """Return the open FTPS session, logging in again if it has gone stale."""
+        if self._ftps is not None:
+            try:
+                self._ftps.voidcmd("NOOP")
+                return self._ftps
+            except all_errors:
+                logger.info("FTPS session went stale, reconnecting")
+                self._close_ftps()
+
+        # Connect via implicit FTPS (SSL from the start on port 990)
+        ftps = ImplicitFTPS(self.ip, self.FTPS_PORT)
+        ftps.login("bblp", self.access_code)
+        self._ftps = ftps
+        return ftps
+
+    def _close_ftps(self):
+        if self._ftps is None:
+            return
+        try:
+            self._ftps.quit()
+        except all_errors:
+            self._ftps.close()
+        self._ftps = None
+
     def start_print(self, filename: str) -> bool:
         """Start printing a file that's already on the printer."""
-        if not self._mqtt_client or not self._connected:
+        if not self._mqtt_client or not self._connected.is_set():
             logger.error("Not connected to printer")
             return False
 
@@ -304,7 +346,7 @@ class BambuPrinter:
 
             topic = f"device/{self.serial}/request"
             seq_id = str(int(time.time()))
-            payload = json.dumps({
+            payload = orjson.dumps({
                 "print": {
                     "sequence_id": seq_id,
                     "command": "project_file",
@@ -332,7 +374,7 @@ class BambuPrinter:
         if not self._mqtt_client:
             return
         topic = f"device/{self.serial}/request"
-        payload = json.dumps({
+        payload = orjson.dumps({
             "print": {
                 "sequence_id": "0",
                 "command": "clean_print_error"
@@ -342,12 +384,12 @@ class BambuPrinter:
 
     def stop_print(self) -> bool:
         """Stop the current print."""
-        if not self._mqtt_client or not self._connected:
+        if not self._mqtt_client or not self._connected.is_set():
             return False
 
         try:
             topic = f"device/{self.serial}/request"
-            payload = json.dumps({
+            payload = orjson.dumps({
                 "print": {
                     "sequence_id": "0",
                     "command": "stop"
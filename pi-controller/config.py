@@ -18,6 +18,9 @@ class Settings(BaseSettings):
 
     # File storage
     download_dir: str = "/tmp/print-jobs"
+    download_chunk_size_bytes: int = 1 << 20
+    # Jobs to claim and download ahead while printing (0 disables)
+    prefetch_jobs: int = 0
 
     class Config:
         env_file = ".env"
@@ -9,12 +9,19 @@ and monitors print status.
 import os
 import sys
 import time
+import queue
+import threading
 import signal
 import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 from config import get_settings
-from api_client import APIClient, Job
+import httpx
+
+from api_client import RETRY_ATTEMPTS, APIClient, Job, retry_delay
 from bambu_printer import BambuPrinter, PrinterStatus
 
 # Configure logging
@@ -42,33 +49,127 @@ def ensure_download_dir(download_dir: str) -> Path:
     return path
 
 
+def job_file_path(job: Job, download_dir: Path) -> Path:
+    return download_dir / f"{job.id}_{job.filename}"
+
+
 def download_job_file(api: APIClient, job: Job, download_dir: Path) -> Path:
     """Download the job file from Tigris storage."""
     download_url = api.get_download_url(job.id)
-    file_path = download_dir / f"{job.id}_{job.filename}"
+    file_path = job_file_path(job, download_dir)
     api.download_file(download_url, str(file_path))
     return file_path
 
 
-def process_job(api: APIClient, printer: BambuPrinter, job: Job, download_dir: Path):
-    """Process a single print job."""
-    logger.info(f"Processing job {job.id}: {job.filename}")
+def start_download(api: APIClient, job: Job, download_dir: Path) -> Future:
+    """Download the job file on a daemon thread.
+
+    Not a ThreadPoolExecutor: its workers are joined at interpreter exit, so a
+    slow download would hold up shutdown.
+    """
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(download_job_file(api, job, download_dir))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"prefetch-{job.id}", daemon=True).start()
+    return future
 
+
+def prefetch_jobs(api: APIClient, download_dir: Path, count: int) -> list[tuple[Job, Future]]:
+    """Claim up to `count` more jobs and start downloading their files."""
+    prefetched = []
     try:
-        # Download the file
-        logger.info(f"Downloading {job.filename}...")
-        file_path = download_job_file(api, job, download_dir)
-        logger.info(f"Downloaded to {file_path}")
+        for _ in range(count):
+            job = api.get_next_job()
+            if job is None:
+                break
+            logger.info(f"Prefetching job {job.id}: {job.filename}")
+            prefetched.append((job, start_download(api, job, download_dir)))
+    except Exception as e:
+        logger.warning(f"Failed to prefetch jobs: {e}")
+    return prefetched
+
+
+def release_prefetched_jobs(api: APIClient, prefetched: deque[tuple[Job, Future]], download_dir: Path):
+    """Hand claimed jobs that were never started back to the API and delete their files."""
+    for job, _ in prefetched:
+        try:
+            api.release_job(job.id)
+            logger.info(f"Released prefetched job {job.id}")
+        except Exception as e:
+            logger.error(f"Failed to release prefetched job {job.id}: {e}")
+        try:
+            os.remove(job_file_path(job, download_dir))
+        except OSError:
+            pass
+
+
+def upload_job_file(
+    api: APIClient, printer: BambuPrinter, job: Job, remote_filename: str, file_path: Optional[Path]
+) -> bool:
+    """Send the job file to the printer, retrying with backoff.
+
+    Uses the prefetched `file_path` if there is one, otherwise streams the
+    file from Tigris straight to the printer. An interrupted transfer has to
+    start over anyway, so each retry repeats the whole download and upload.
+    """
+    download_url = None if file_path else api.get_download_url(job.id)
+
+    for attempt in range(RETRY_ATTEMPTS):
+        if attempt:
+            delay = retry_delay(attempt - 1)
+            logger.warning(f"Retrying upload of job {job.id} in {delay:.1f}s")
+            time.sleep(delay)
+
+        if file_path:
+            if printer.upload_file(str(file_path), remote_filename):
+                return True
+            continue
+
+        logger.info(f"Streaming {job.filename} to printer as {remote_filename}...")
+        try:
+            with api.stream_file(download_url) as source:
+                if printer.upload_fileobj(source, remote_filename):
+                    return True
+        except httpx.TransportError as e:
+            logger.warning(f"Error downloading job {job.id}: {e}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code < 500:
+                raise
+            logger.warning(f"Error downloading job {job.id}: {e}")
+
+    return False
+
+
+def process_job(api: APIClient, printer: BambuPrinter, job: Job, download: Optional[Future] = None):
+    """Process a single print job.
+
+    `download` is a prefetch of the job file; if it's missing or failed, the
+    file is streamed from Tigris instead.
+    """
+    logger.info(f"Processing job {job.id}: {job.filename}")
 
-        # Upload to printer
+    file_path = None
+    if download is not None:
+        try:
+            file_path = download.result()
+        except Exception as e:
+            logger.warning(f"Prefetch of job {job.id} failed, streaming instead: {e}")
+
+    try:
         remote_filename = f"{job.id}.3mf"
-        logger.info(f"Uploading to printer as {remote_filename}...")
-        if not printer.upload_file(str(file_path), remote_filename):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Mark the job as printing while the upload runs
+            started = executor.submit(api.start_job, job.id)
+            uploaded = upload_job_file(api, printer, job, remote_filename, file_path)
+            started.result()
+        if not uploaded:
             raise Exception("Failed to upload file to printer")
-
-        # Mark job as printing
-        api.start_job(job.id)
-        logger.info(f"Job {job.id} marked as printing")
+        logger.info(f"Job {job.id} uploaded and marked as printing")
 
         # Start the print
         if not printer.start_print(remote_filename):
@@ -77,12 +178,6 @@ def process_job(api: APIClient, printer: BambuPrinter, job: Job, download_dir: P
         # Monitor print progress
         monitor_print(api, printer, job)
 
-        # Clean up downloaded file
-        try:
-            os.remove(file_path)
-        except OSError:
-            pass
-
     except Exception as e:
         logger.error(f"Error processing job {job.id}: {e}")
         try:
@@ -90,39 +185,94 @@ def process_job(api: APIClient, printer: BambuPrinter, job: Job, download_dir: P
         except Exception as fail_error:
             logger.error(f"Failed to mark job as failed: {fail_error}")
 
+    finally:
+        # Clean up prefetched file
+        if file_path:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
 
 def monitor_print(api: APIClient, printer: BambuPrinter, job: Job):
     """Monitor the print until it completes or fails."""
     settings = get_settings()
-    last_progress = -1
-    last_progress_update = 0
 
     logger.info(f"Monitoring print for job {job.id}...")
 
+    # React to MQTT status pushes as they arrive instead of polling
+    statuses: queue.Queue[PrinterStatus] = queue.Queue()
+    printer.set_status_callback(statuses.put)
+    try:
+        # Progress is reported from a worker thread so a slow API never holds
+        # up reacting to the printer
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress") as progress_sender:
+            _monitor_statuses(
+                api, printer, job, statuses, progress_sender,
+                settings.progress_update_interval_seconds,
+            )
+    finally:
+        printer.set_status_callback(None)
+
+
+def _send_progress(api: APIClient, job: Job, status: PrinterStatus) -> bool:
+    try:
+        api.update_progress(job.id, status.progress, status.layer_num, status.remaining_time)
+        logger.info(
+            f"Job {job.id} progress: {status.progress}% "
+            f"(layer {status.layer_num}/{status.total_layers}, "
+            f"{status.remaining_time}min remaining)"
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to update progress: {e}")
+        return False
+
+
+def _monitor_statuses(
+    api: APIClient,
+    printer: BambuPrinter,
+    job: Job,
+    statuses: queue.Queue[PrinterStatus],
+    progress_sender: ThreadPoolExecutor,
+    progress_update_interval: int,
+):
+    last_progress = -1
+    last_progress_update = 0
+    # The in-flight update, with the progress and time it was sent at
+    pending_progress: Optional[tuple[Future, int, float]] = None
+
     while not shutdown_requested:
-        status = printer.status
+        try:
+            # At least a second, so an interval of 0 doesn't spin the loop
+            status = statuses.get(timeout=max(progress_update_interval, 1))
+        except queue.Empty:
+            # No push in a while; re-check the latest status so a throttled
+            # progress update still goes out
+            status = printer.status
 
         if status is None:
-            time.sleep(2)
             continue
 
-        # Update progress if changed and enough time has passed
+        # Only count an update as sent once it has succeeded, so a failed one
+        # is retried
+        if pending_progress is not None and pending_progress[0].done():
+            sent, progress, sent_at = pending_progress
+            if sent.result():
+                last_progress = progress
+                last_progress_update = sent_at
+            pending_progress = None
+
+        # Update progress if changed, enough time has passed and the previous
+        # update is no longer in flight
         current_time = time.time()
         if (
-            status.progress != last_progress
-            and current_time - last_progress_update >= settings.progress_update_interval_seconds
+            pending_progress is None
+            and status.progress != last_progress
+            and current_time - last_progress_update >= progress_update_interval
         ):
-            try:
-                api.update_progress(job.id, status.progress)
-                last_progress = status.progress
-                last_progress_update = current_time
-                logger.info(
-                    f"Job {job.id} progress: {status.progress}% "
-                    f"(layer {status.layer_num}/{status.total_layers}, "
-                    f"{status.remaining_time}min remaining)"
-                )
-            except Exception as e:
-                logger.warning(f"Failed to update progress: {e}")
+            sent = progress_sender.submit(_send_progress, api, job, status)
+            pending_progress = (sent, status.progress, current_time)
 
         # Check for completion
         if status.state == "FINISH":
@@ -153,8 +303,6 @@ def monitor_print(api: APIClient, printer: BambuPrinter, job: Job):
                 logger.error(f"Failed to mark job as failed: {e}")
             return
 
-        time.sleep(2)
-
     # Shutdown requested during print
     logger.warning(f"Shutdown requested while printing job {job.id}")
 
@@ -182,6 +330,9 @@ def main():
     api = APIClient()
     printer = BambuPrinter()
 
+    # Jobs claimed ahead of time, with their file downloads
+    prefetched: deque[tuple[Job, Future]] = deque()
+
     logger.info("Pi Controller starting...")
     logger.info(f"API URL: {settings.api_url}")
     logger.info(f"Printer IP: {settings.bambu_ip}")
@@ -200,22 +351,29 @@ def main():
                     time.sleep(settings.poll_interval_seconds)
                     continue
 
-                # Poll for next job
-                logger.debug("Checking for new jobs...")
-                job = api.get_next_job()
+                if prefetched:
+                    job, download = prefetched.popleft()
+                else:
+                    # Long-poll for the next job; the API waits for up to the
+                    # poll interval, so there's no need to sleep between polls
+                    logger.debug("Checking for new jobs...")
+                    job = api.get_next_job(wait=settings.poll_interval_seconds)
+                    download = None
 
                 if job:
                     logger.info(f"Found job: {job.id} - {job.filename}")
-                    process_job(api, printer, job, download_dir)
+                    # Download the next jobs while this one prints
+                    prefetched.extend(prefetch_jobs(api, download_dir, settings.prefetch_jobs - len(prefetched)))
+                    process_job(api, printer, job, download)
                 else:
                     logger.debug("No jobs available")
 
             except Exception as e:
                 logger.error(f"Error in main loop: {e}")
 
-            # Wait before next poll
-            if not shutdown_requested:
-                time.sleep(settings.poll_interval_seconds)
+                # Back off before retrying
+                if not shutdown_requested:
+                    time.sleep(settings.poll_interval_seconds)
 
     except KeyboardInterrupt:
         logger.info("Interrupted")
@@ -224,6 +382,7 @@ def main():
         sys.exit(1)
     finally:
         logger.info("Shutting down...")
+        release_prefetched_jobs(api, prefetched, download_dir)
         printer.disconnect()
         api.close()
         logger.info("Goodbye!")